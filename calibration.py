@@ -0,0 +1,87 @@
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.isotonic import IsotonicRegression
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class CalibratedLinearModel:
+    """Wraps a fitted linear model so predict_proba comes from one decision_function pass.
+
+    Calibration is stored either as Platt sigmoid parameters (slope, intercept)
+    or as an isotonic lookup table (score thresholds -> probabilities), so it
+    adds only a few array operations per prediction.
+    """
+
+    def __init__(self, model, method='sigmoid', slope=1.0, intercept=0.0, table_x=None, table_y=None):
+        self.model = model
+        self.classes_ = model.classes_
+        self.method = method
+        self.slope = slope
+        self.intercept = intercept
+        self.table_x = table_x
+        self.table_y = table_y
+
+    def decision_function(self, X):
+        return self.model.decision_function(X)
+
+    def _positive(self, scores):
+        if self.method == 'isotonic':
+            return np.interp(scores, self.table_x, self.table_y)
+        return _sigmoid(self.slope * scores + self.intercept)
+
+    def predict(self, X):
+        # Calibration only changes confidences; labels keep the wrapped model's decision rule
+        return self.model.predict(X)
+
+    def predict_proba(self, X):
+        positive = self._positive(self.model.decision_function(X))
+        return np.column_stack([1.0 - positive, positive])
+
+
+def calibrate_model(model, X_calib, y_calib, method='sigmoid'):
+    """Fits Platt ('sigmoid') or 'isotonic' calibration on held-out decision scores."""
+    if len(model.classes_) != 2:
+        raise ValueError("Calibration only supports binary models")
+
+    scores = model.decision_function(X_calib)
+    y = (np.asarray(y_calib) == model.classes_[1]).astype(int)
+
+    if method == 'isotonic':
+        iso = IsotonicRegression(out_of_bounds='clip', y_min=0.0, y_max=1.0)
+        iso.fit(scores, y)
+        return CalibratedLinearModel(model, method='isotonic',
+                                     table_x=iso.X_thresholds_, table_y=iso.y_thresholds_)
+    if method == 'sigmoid':
+        platt = LogisticRegression(C=1e6)
+        platt.fit(scores.reshape(-1, 1), y)
+        return CalibratedLinearModel(model, method='sigmoid',
+                                     slope=float(platt.coef_[0, 0]), intercept=float(platt.intercept_[0]))
+    raise ValueError(f"Unknown calibration method: {method}")
+
+
+def predicted_label_confidences(model, X):
+    """Returns (model.predict labels, probability of each predicted label in percent).
+
+    The confidence is read from the predicted label's column rather than
+    taking the larger probability, so it always describes the label shown
+    (a calibrated model can give its predicted label less than 50%).
+    """
+    labels = model.predict(X)
+    probabilities = predict_probabilities(model, X)
+    columns = np.searchsorted(model.classes_, labels)
+    return labels, probabilities[np.arange(len(labels)), columns] * 100
+
+
+def predict_probabilities(model, X):
+    """predict_proba when available, otherwise an uncalibrated sigmoid of the decision scores."""
+    if hasattr(model, 'predict_proba'):
+        return model.predict_proba(X)
+    scores = model.decision_function(X)
+    if scores.ndim == 1:
+        positive = _sigmoid(scores)
+        return np.column_stack([1.0 - positive, positive])
+    exp = np.exp(scores - scores.max(axis=1, keepdims=True))
+    return exp / exp.sum(axis=1, keepdims=True)
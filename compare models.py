@@ -8,6 +8,10 @@ from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_sc
 import joblib
 import os
 
+from calibration import calibrate_model
+from model_registry import register_model, dataset_hash
+from near_duplicates import drop_near_duplicates
+
 # Load the combined dataset
 try:
     df = pd.read_csv(r'C:\Users\dhanu\Downloads\reduced nlp\combined_gender_text.csv', encoding='utf-8')
@@ -24,6 +28,10 @@ except Exception as e:
 # Preprocessing
 df.dropna(subset=['text', 'gender'], inplace=True)
 df = df[df['gender'].isin(['male', 'female'])]
+# Drop near-duplicates (retweets, templated posts) so copies cannot land in both train and test
+rows_before = len(df)
+df = drop_near_duplicates(df)
+print(f"\nRemoved {rows_before - len(df)} near-duplicate texts.")
 print("\nGender distribution after preprocessing:")
 print(df['gender'].value_counts())
 
@@ -34,6 +42,8 @@ y = df['gender']
 
 # Train-test split
 X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+# Hold out part of the training data to calibrate models without predict_proba
+X_train, X_calib, y_train, y_calib = train_test_split(X_train, y_train, test_size=0.1, random_state=42)
 
 # Models to compare
 models = {
@@ -74,6 +84,11 @@ best_model_name = max(results, key=lambda name: results[name]['f1'])
 best_model = models[best_model_name]
 print(f"\nBest model selected: **{best_model_name}** based on F1-score.")
 
+# Calibrate models like LinearSVC so the saved artifact gives real confidences
+if not hasattr(best_model, 'predict_proba'):
+    print(f"Calibrating {best_model_name} on held-out scores...")
+    best_model = calibrate_model(best_model, X_calib, y_calib, method='sigmoid')
+
 # Save best model and vectorizer
 print("\nSaving best model and vectorizer...")
 try:
@@ -83,13 +98,24 @@ try:
 except Exception as e:
     print(f"Error saving model: {e}")
 
+# Register a versioned copy with its metrics so earlier models are not lost
+try:
+    version = register_model(best_model, vectorizer,
+                             metrics=dict(results[best_model_name], compared_models=results),
+                             data_hash=dataset_hash(df[['text', 'gender']]),
+                             notes=f"compare models.py: {best_model_name}")
+    print(f"Registered model version {version}.")
+except Exception as e:
+    print(f"Error registering model: {e}")
+
 # Gender prediction function
 def predict_gender(text):
     text_vectorized = vectorizer.transform([text])
     predicted_gender = best_model.predict(text_vectorized)[0]
     try:
         probabilities = best_model.predict_proba(text_vectorized)[0]
-        confidence = probabilities.max() * 100
+        # Probability of the predicted label, which calibration can put below 50%
+        confidence = probabilities[list(best_model.classes_).index(predicted_gender)] * 100
     except AttributeError:
         confidence = 100  # SVMs don't return probabilities by default
     return predicted_gender, confidence
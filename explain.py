@@ -0,0 +1,129 @@
+import numpy as np
+
+from calibration import CalibratedLinearModel
+
+TOP_K = 5
+
+_cached_explainer = None
+
+
+def term_weights(model):
+    """Per-feature weight towards classes_[1] for binary linear and Naive Bayes models."""
+    if isinstance(model, CalibratedLinearModel):
+        model = model.model
+    if len(model.classes_) != 2:
+        raise ValueError("Explanations only support binary models")
+    if hasattr(model, 'feature_log_prob_'):
+        # NB log-odds are linear in the features: X @ (log_prob[1] - log_prob[0]) + prior
+        return model.feature_log_prob_[1] - model.feature_log_prob_[0]
+    if hasattr(model, 'coef_'):
+        return np.asarray(model.coef_).ravel()
+    raise ValueError(f"Unsupported model type: {type(model).__name__}")
+
+
+class TermExplainer:
+    """Top contributing terms per prediction, from the TF-IDF non-zeros times the model weights.
+
+    Each contribution is tfidf value * weight, so it costs one multiply per
+    non-zero plus one argpartition per block of rows, about as much as
+    vectorizing and predicting.
+    """
+
+    def __init__(self, model, vectorizer):
+        self.model = model
+        self.vectorizer = vectorizer
+        self.weights = term_weights(model)
+        self.classes_ = model.classes_
+        if hasattr(vectorizer, 'get_feature_names_out'):
+            self.feature_names = vectorizer.get_feature_names_out()
+        else:
+            self.feature_names = np.array(vectorizer.get_feature_names())
+
+    def explain(self, X, k=TOP_K, block_rows=256):
+        """Returns, for each row of X, up to k (term, contribution) pairs by |contribution|.
+
+        Positive contributions push towards classes_[1], negative towards classes_[0].
+        """
+        X = X.tocsr()
+        explanations = []
+        for start in range(0, X.shape[0], block_rows):
+            explanations.extend(self._explain_block(X[start:start + block_rows], k))
+        return explanations
+
+    def _explain_block(self, X, k):
+        contributions = X.data * self.weights[X.indices]
+        nnz = np.diff(X.indptr)
+        width = max(int(nnz.max()) if len(nnz) else 0, 1)
+
+        # Lay each row's |contribution| out in a padded matrix so one argpartition covers the block
+        rows = np.repeat(np.arange(X.shape[0]), nnz)
+        positions = np.arange(X.nnz) - X.indptr[rows]
+        magnitudes = np.full((X.shape[0], width), -1.0)
+        magnitudes[rows, positions] = np.abs(contributions)
+
+        k_eff = min(k, width)
+        top = np.argpartition(-magnitudes, k_eff - 1, axis=1)[:, :k_eff]
+        order = np.argsort(-np.take_along_axis(magnitudes, top, axis=1), axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        flat = X.indptr[:-1, None] + top
+
+        explanations = []
+        for row_flat, row_top, row_nnz in zip(flat, top, nnz):
+            valid = row_flat[row_top < row_nnz]
+            explanations.append(list(zip(self.feature_names[X.indices[valid]].tolist(),
+                                         contributions[valid].tolist())))
+        return explanations
+
+    def format(self, explanation):
+        """Human-readable 'term (class weight)' list."""
+        parts = []
+        for term, contribution in explanation:
+            towards = self.classes_[1] if contribution > 0 else self.classes_[0]
+            parts.append(f"{term} ({towards} {abs(contribution):.3f})")
+        return ', '.join(parts)
+
+
+def get_explainer(model, vectorizer):
+    """Returns a TermExplainer for the pair, reusing the last one built, or None if unsupported."""
+    global _cached_explainer
+    if (_cached_explainer is not None and _cached_explainer.model is model
+            and _cached_explainer.vectorizer is vectorizer):
+        return _cached_explainer
+    try:
+        _cached_explainer = TermExplainer(model, vectorizer)
+    except ValueError:
+        return None
+    return _cached_explainer
+
+
+if __name__ == "__main__":
+    import time
+    import joblib
+    import pandas as pd
+
+    model = joblib.load('gender_model.joblib')
+    vectorizer = joblib.load('vectorizer.joblib')
+    explainer = TermExplainer(model, vectorizer)
+
+    example_texts = [
+        "I love coding and playing video games.",
+        "Shopping for new shoes and dresses today!",
+        "Working on my car in the garage.",
+        "Baking cookies for the family.",
+        "Just finished a great workout at the gym."
+    ]
+    X = vectorizer.transform(example_texts)
+    for text, label, explanation in zip(example_texts, model.predict(X), explainer.explain(X)):
+        print(f"\nText: {text}")
+        print(f"Predicted gender: {label}")
+        print(f"Top terms: {explainer.format(explanation)}")
+
+    texts = pd.read_csv('twitter_reduced.csv', encoding='utf-8')['text'].dropna().tolist()
+    start = time.perf_counter()
+    X = vectorizer.transform(texts)
+    model.predict(X)
+    predict_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    explainer.explain(X)
+    explain_ms = (time.perf_counter() - start) * 1000
+    print(f"\n{len(texts)} texts: transform + predict {predict_ms:.1f} ms, explain {explain_ms:.1f} ms")
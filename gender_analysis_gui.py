@@ -1,12 +1,20 @@
+import time
+_IMPORT_START = time.perf_counter()
+
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, filedialog
-from textblob import TextBlob
-import joblib
 from datetime import datetime
 import os
 import re
+import queue
+import threading
 from tkinter import simpledialog
 
+# joblib, scikit-learn and TextBlob are imported by the background loader,
+# so only tkinter is paid for before the window appears
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_START
+STARTUP_LOG = 'startup_times.log'
+
 class GenderAnalysisGUI:
     def __init__(self, root):
         self.root = root
@@ -16,10 +24,17 @@ class GenderAnalysisGUI:
         
         # Configure styles
         self.configure_styles()
-        
-        # Load models
-        self.load_models()
         self.create_gui()
+
+        # Load models in the background so the window appears immediately
+        self.models_ready = False
+        self.load_error = None
+        self.pending_texts = []
+        self.load_results = queue.Queue()
+        self.status_var.set("Loading models...")
+        threading.Thread(target=self.load_in_background, daemon=True).start()
+        self.root.after(100, self.check_loading)
+        self.root.after_idle(self.record_first_paint)
         
         # Bind keyboard shortcuts
         self.root.bind('<Control-a>', lambda e: self.analyze_text())
@@ -37,22 +52,88 @@ class GenderAnalysisGUI:
         style.configure('TLabelframe.Label', font=('Arial', 11, 'bold'))
 
     def load_models(self):
-        try:
-            model_path = 'gender_model.joblib'
-            vectorizer_path = 'vectorizer.joblib'
+        """Load the model and vectorizer. Runs on the loader thread, so no tkinter calls here."""
+        import joblib
+        from model_registry import HotReloadingPredictor, current_version
+
+        # Prefer the model registry; new versions are swapped in as they are promoted
+        self.predictor = None
+        if current_version() is not None:
+            self.predictor = HotReloadingPredictor()
+            print(f"Model version {self.predictor.version} loaded from registry!")
+            return
+
+        model_path = 'gender_model.joblib'
+        vectorizer_path = 'vectorizer.joblib'
+        
+        if not os.path.exists(model_path) or not os.path.exists(vectorizer_path):
+            raise FileNotFoundError("Model files not found")
             
-            if not os.path.exists(model_path) or not os.path.exists(vectorizer_path):
-                raise FileNotFoundError("Model files not found")
-                
-            self.model = joblib.load(model_path)
-            self.vectorizer = joblib.load(vectorizer_path)
-            print("Models loaded successfully!")
-        except FileNotFoundError as e:
-            messagebox.showerror("Error", str(e))
-            self.root.destroy()
+        self.model = joblib.load(model_path)
+        self.vectorizer = joblib.load(vectorizer_path)
+        print("Models loaded successfully!")
+
+    def load_in_background(self):
+        """Import the heavy libraries, load the models and warm up TextBlob off the UI thread."""
+        try:
+            self.load_models()
+            from textblob import TextBlob
+            import calibration, explain, utils  # noqa: F401
+            # The sentiment lexicon is read on first use; do it now rather than on the first analysis
+            TextBlob("warm up").sentiment
+            self.load_results.put(None)
         except Exception as e:
-            messagebox.showerror("Error", f"Could not load models: {str(e)}")
-            self.root.destroy()
+            self.load_results.put(e)
+
+    def check_loading(self):
+        """Poll the loader thread from the UI thread and run any queued analyses once ready."""
+        try:
+            error = self.load_results.get_nowait()
+        except queue.Empty:
+            self.root.after(100, self.check_loading)
+            return
+
+        if error is not None:
+            self.load_error = error
+            self.pending_texts.clear()
+            self.status_var.set("Model loading failed")
+            if isinstance(error, FileNotFoundError):
+                messagebox.showerror("Error", str(error))
+            else:
+                messagebox.showerror("Error", f"Could not load models: {str(error)}")
+            return
+
+        self.models_ready = True
+        self.ready_seconds = time.perf_counter() - _IMPORT_START
+        self.log_startup_times()
+        self.status_var.set("Ready")
+
+        pending, self.pending_texts = self.pending_texts, []
+        for text in pending:
+            self.run_analysis(text)
+
+    def record_first_paint(self):
+        self.root.update_idletasks()
+        self.first_paint_seconds = time.perf_counter() - _IMPORT_START
+
+    def log_startup_times(self):
+        """Print startup timings and append them to STARTUP_LOG to track regressions."""
+        first_paint = getattr(self, 'first_paint_seconds', float('nan'))
+        print(f"Startup: imports {IMPORT_SECONDS:.3f}s, first paint {first_paint:.3f}s, "
+              f"models ready {self.ready_seconds:.3f}s")
+        try:
+            with open(STARTUP_LOG, 'a', encoding='utf-8') as f:
+                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                f.write(f"{timestamp},{IMPORT_SECONDS:.4f},{first_paint:.4f},{self.ready_seconds:.4f}\n")
+        except OSError as e:
+            print(f"Could not write startup log: {e}")
+
+    def get_model(self):
+        """Returns the (model, vectorizer) pair to use for the next prediction."""
+        if self.predictor is not None:
+            _, model, vectorizer = self.predictor.snapshot()
+            return model, vectorizer
+        return self.model, self.vectorizer
 
     def create_gui(self):
         # Main frame
@@ -94,6 +175,7 @@ class GenderAnalysisGUI:
         results = [
             ("Gender Prediction:", "gender_var"),
             ("Confidence:", "confidence_var"),
+            ("Top Terms:", "top_terms_var"),
             ("Sentiment:", "sentiment_var"),
             ("Polarity:", "polarity_var"),
             ("Mood:", "mood_var")
@@ -116,6 +198,10 @@ class GenderAnalysisGUI:
         self.progress_bar = ttk.Progressbar(history_frame, variable=self.progress_var, maximum=100)
         self.progress_bar.grid(row=1, column=0, sticky='ew', pady=(5, 0))
 
+        # Status label (model loading state, queued analyses)
+        self.status_var = tk.StringVar()
+        ttk.Label(history_frame, textvariable=self.status_var, style='TLabel').grid(row=2, column=0, sticky='w', pady=(5, 0))
+
     def add_tooltip(self, widget, text):
         def show_tooltip(event):
             x, y, _, _ = widget.bbox("insert")
@@ -143,43 +229,8 @@ class GenderAnalysisGUI:
 
     def analyze_mood(self, text, polarity, subjectivity):
         """Analyze the mood based on text content and sentiment metrics."""
-        # Count various indicators
-        exclamation_count = text.count('!')
-        question_count = text.count('?')
-        caps_ratio = sum(1 for c in text if c.isupper()) / len(text) if text else 0
-        word_count = len(text.split())
-        
-        # Enhanced mood analysis
-        if polarity > 0.7 and exclamation_count > 1:
-            return "Very Excited/Enthusiastic"
-        elif polarity > 0.5 and exclamation_count > 0:
-            return "Excited/Enthusiastic"
-        elif polarity > 0.3:
-            return "Happy/Positive"
-        elif polarity < -0.7:
-            return "Very Angry/Frustrated"
-        elif polarity < -0.5:
-            return "Angry/Frustrated"
-        elif polarity < -0.3:
-            return "Sad/Negative"
-        elif question_count > 2:
-            return "Very Curious/Questioning"
-        elif question_count > 0:
-            return "Curious/Questioning"
-        elif caps_ratio > 0.5:
-            return "Very Emphatic/Intense"
-        elif caps_ratio > 0.3:
-            return "Emphatic/Intense"
-        elif subjectivity > 0.9:
-            return "Very Emotional"
-        elif subjectivity > 0.8:
-            return "Emotional"
-        elif subjectivity < 0.1:
-            return "Very Objective/Factual"
-        elif subjectivity < 0.2:
-            return "Objective/Factual"
-        else:
-            return "Neutral"
+        import utils
+        return utils.analyze_mood(text, polarity, subjectivity)
 
     def analyze_text(self):
         """Analyze the input text for gender, sentiment, and mood."""
@@ -188,6 +239,24 @@ class GenderAnalysisGUI:
             messagebox.showwarning("Warning", "Please enter some text to analyze.")
             return
 
+        if self.load_error is not None:
+            messagebox.showerror("Error", f"Models are not available: {str(self.load_error)}")
+            return
+        if not self.models_ready:
+            # Queue the text; check_loading runs it as soon as the models are loaded
+            self.pending_texts.append(text)
+            self.status_var.set(f"Loading models... {len(self.pending_texts)} analysis(es) queued")
+            return
+
+        self.run_analysis(text)
+
+    def run_analysis(self, text):
+        """Run gender, sentiment and mood analysis on text once the models are loaded."""
+        from textblob import TextBlob
+        from calibration import predicted_label_confidences
+        from explain import get_explainer
+        from utils import sentiment_label
+
         try:
             # Show progress
             self.progress_var.set(20)
@@ -198,10 +267,12 @@ class GenderAnalysisGUI:
             
             # Gender prediction
             self.progress_var.set(40)
-            text_vectorized = self.vectorizer.transform([text])
-            gender = self.model.predict(text_vectorized)[0]
-            probabilities = self.model.predict_proba(text_vectorized)[0]
-            confidence = max(probabilities) * 100
+            model, vectorizer = self.get_model()
+            text_vectorized = vectorizer.transform([text])
+            labels, confidences = predicted_label_confidences(model, text_vectorized)
+            gender, confidence = labels[0], confidences[0]
+            explainer = get_explainer(model, vectorizer)
+            top_terms = explainer.format(explainer.explain(text_vectorized)[0]) if explainer else "n/a"
 
             # Sentiment analysis
             self.progress_var.set(60)
@@ -210,16 +281,7 @@ class GenderAnalysisGUI:
             subjectivity = blob.sentiment.subjectivity
 
             # Determine sentiment label
-            if polarity > 0.3:
-                sentiment = "Very Positive"
-            elif polarity > 0:
-                sentiment = "Positive"
-            elif polarity < -0.3:
-                sentiment = "Very Negative"
-            elif polarity < 0:
-                sentiment = "Negative"
-            else:
-                sentiment = "Neutral"
+            sentiment = sentiment_label(polarity)
 
             # Determine mood
             self.progress_var.set(80)
@@ -228,6 +290,7 @@ class GenderAnalysisGUI:
             # Update GUI
             self.gender_var.set(f"{gender.title()}")
             self.confidence_var.set(f"{confidence:.2f}%")
+            self.top_terms_var.set(top_terms)
             self.sentiment_var.set(sentiment)
             self.polarity_var.set(f"{polarity:.2f} (Subjectivity: {subjectivity:.2f})")
             self.mood_var.set(mood)
@@ -237,6 +300,7 @@ class GenderAnalysisGUI:
             history_entry = f"[{timestamp}]\n"
             history_entry += f"Text: {text}\n"
             history_entry += f"Gender: {gender.title()} ({confidence:.2f}%)\n"
+            history_entry += f"Top Terms: {top_terms}\n"
             history_entry += f"Sentiment: {sentiment} (Polarity: {polarity:.2f})\n"
             history_entry += f"Mood: {mood}\n"
             history_entry += "-" * 50 + "\n"
@@ -245,6 +309,7 @@ class GenderAnalysisGUI:
             self.history_text.see(tk.END)
             
             # Complete progress
+            self.status_var.set("Ready")
             self.progress_var.set(100)
             self.root.after(1000, lambda: self.progress_var.set(0))
 
@@ -257,6 +322,7 @@ class GenderAnalysisGUI:
         self.text_input.delete("1.0", tk.END)
         self.gender_var.set("")
         self.confidence_var.set("")
+        self.top_terms_var.set("")
         self.sentiment_var.set("")
         self.polarity_var.set("")
         self.mood_var.set("")
@@ -6,6 +6,8 @@ from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_sc
 import joblib
 import os
 
+from model_registry import register_model, dataset_hash
+
 # Load the combined dataset
 try:
     df = pd.read_csv(r'C:\Users\dhanu\Downloads\reduced nlp\combined_gender_text.csv', encoding='utf-8')
@@ -69,6 +71,16 @@ try:
 except Exception as e:
     print(f"Error saving model: {e}")
 
+# Register a versioned copy with its metrics so earlier models are not lost
+try:
+    version = register_model(model, vectorizer,
+                             metrics={'accuracy': accuracy, 'precision': precision, 'recall': recall, 'f1': f1},
+                             data_hash=dataset_hash(df[['text', 'gender']]),
+                             notes="gender_prediction_simple.py: Logistic Regression")
+    print(f"Registered model version {version}.")
+except Exception as e:
+    print(f"Error registering model: {e}")
+
 def predict_gender(text):
     """Predicts the gender based on the input text."""
     text_vectorized = vectorizer.transform([text])
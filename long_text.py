@@ -0,0 +1,170 @@
+import re
+import math
+import numpy as np
+
+from utils import preprocess_text
+
+WINDOW_CHARS = 2000
+WINDOWS_PER_BATCH = 4
+# Tuned on out-of-fold predictions for the bundled blog posts longer than two
+# windows: at 0.8 scoring stops early on some posts and always agrees with
+# scoring every window, while 0.95 almost never fires (per-window confidences
+# on this data are low, so even whole posts rarely reach it).
+CONFIDENCE_THRESHOLD = 0.8
+MIN_WINDOWS = 2
+
+# Greedy match up to the last whitespace character (space, newline, tab, ...)
+_LAST_WHITESPACE = re.compile(r'.*\s', re.DOTALL)
+
+
+def _iter_pieces(source, read_size):
+    """Yields raw string pieces from a string, file-like object or iterable of strings."""
+    if isinstance(source, str):
+        yield source
+    elif hasattr(source, 'read'):
+        while True:
+            piece = source.read(read_size)
+            if not piece:
+                break
+            yield piece
+    else:
+        for piece in source:
+            yield piece
+
+
+def iter_windows(source, window_chars=WINDOW_CHARS):
+    """Splits text into windows of about window_chars, cutting on whitespace.
+
+    Only one window plus a partial buffer is held in memory at a time, so
+    the source never has to be fully materialized. Windows are sliced by
+    offset and the buffer is compacted once per piece read, so splitting
+    stays linear in the text length.
+    """
+    buffer = ''
+    for piece in _iter_pieces(source, window_chars):
+        buffer += piece
+        start = 0
+        while len(buffer) - start >= window_chars:
+            match = _LAST_WHITESPACE.match(buffer, start, start + window_chars)
+            cut = match.end() - 1 if match else start
+            if cut <= start:
+                cut = start + window_chars
+            window = preprocess_text(buffer[start:cut])
+            start = cut
+            if window:
+                yield window
+        buffer = buffer[start:]
+    window = preprocess_text(buffer)
+    if window:
+        yield window
+
+
+def _batches(windows, size):
+    batch = []
+    for window in windows:
+        batch.append(window)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _decision_scores(model, X):
+    scores = model.decision_function(X)
+    if scores.ndim == 1:
+        # Binary models return one column; expand to the usual (-s/2, s/2) pair
+        scores = np.column_stack([-scores / 2, scores / 2])
+    return scores
+
+
+def _window_scores(model, X):
+    """Per-window (label scores, log-probabilities).
+
+    Labels follow the model's own decision rule (its decision scores when it
+    has them), while confidences come from its probabilities, so a
+    calibrated model keeps the wrapped model's labels. Models without
+    predict_proba use the decision scores for both.
+    """
+    decision = _decision_scores(model, X) if hasattr(model, 'decision_function') else None
+    if hasattr(model, 'predict_proba'):
+        log_probabilities = np.log(np.clip(model.predict_proba(X), 1e-12, 1.0))
+    else:
+        log_probabilities = decision
+    return (log_probabilities if decision is None else decision), log_probabilities
+
+
+def _probabilities(evidence):
+    exp = np.exp(evidence - evidence.max())
+    return exp / exp.sum()
+
+
+def predict_gender_long(model, vectorizer, source, window_chars=WINDOW_CHARS,
+                        threshold=CONFIDENCE_THRESHOLD, min_windows=MIN_WINDOWS,
+                        windows_per_batch=WINDOWS_PER_BATCH):
+    """Predicts gender for a long document by streaming it through the vectorizer window by window.
+
+    Windows are treated as independent pieces of evidence and their scores
+    are summed, so the aggregated confidence keeps growing while the windows
+    agree. Scoring stops as soon as the predicted label's confidence reaches
+    threshold, like a sequential test; a document that fits in one window
+    scores exactly as a whole.
+    Returns (predicted_gender, confidence in percent, windows used).
+    """
+    label_scores = None
+    evidence = None
+    windows_used = 0
+    best = None
+
+    for batch in _batches(iter_windows(source, window_chars), windows_per_batch):
+        batch_labels, batch_evidence = _window_scores(model, vectorizer.transform(batch))
+        if evidence is None:
+            label_scores, evidence = batch_labels.sum(axis=0), batch_evidence.sum(axis=0)
+        else:
+            label_scores += batch_labels.sum(axis=0)
+            evidence += batch_evidence.sum(axis=0)
+        windows_used += len(batch)
+
+        best = int(label_scores.argmax())
+        probabilities = _probabilities(evidence)
+        if windows_used >= min_windows and probabilities[best] >= threshold:
+            break
+
+    if best is None:
+        raise ValueError("No text to analyze")
+
+    return model.classes_[best], float(probabilities[best] * 100), windows_used
+
+
+def predict_gender_file(model, vectorizer, path, **kwargs):
+    """Convenience wrapper streaming a text file from disk."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return predict_gender_long(model, vectorizer, f, **kwargs)
+
+
+if __name__ == "__main__":
+    import time
+    import joblib
+    import pandas as pd
+
+    model = joblib.load('gender_model.joblib')
+    vectorizer = joblib.load('vectorizer.joblib')
+
+    df = pd.read_csv('blogtext_reduced.csv', encoding='utf-8').dropna(subset=['text', 'gender'])
+    longest = df.loc[df['text'].str.len().nlargest(5).index]
+
+    print("Long-text Predictions:")
+    print("-" * 50)
+    for text, gender in zip(longest['text'], longest['gender']):
+        start = time.perf_counter()
+        full_label = model.predict(vectorizer.transform([preprocess_text(text)]))[0]
+        full_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        label, confidence, windows = predict_gender_long(model, vectorizer, text)
+        long_ms = (time.perf_counter() - start) * 1000
+
+        total_windows = math.ceil(len(text) / WINDOW_CHARS)
+        print(f"\n{len(text)} chars, true gender: {gender}")
+        print(f"Whole text: {full_label} ({full_ms:.2f} ms)")
+        print(f"Windowed:   {label} {confidence:.2f}% using {windows}/~{total_windows} windows ({long_ms:.2f} ms)")
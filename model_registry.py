@@ -0,0 +1,201 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import joblib
+import pandas as pd
+
+from utils import write_atomic, predict_with_confidence
+
+REGISTRY_DIR = 'model_registry'
+CURRENT_FILE = 'CURRENT'
+
+# Texts used to warm up and sanity-check a model before it goes live
+WARMUP_TEXTS = [
+    "I love coding and playing video games.",
+    "Shopping for new shoes and dresses today!",
+    "Working on my car in the garage.",
+    "Baking cookies for the family.",
+    "Just finished a great workout at the gym."
+]
+
+
+def _json_default(value):
+    # numpy scalars (metrics from sklearn) become plain numbers
+    return value.item() if hasattr(value, 'item') else str(value)
+
+
+def dataset_hash(df):
+    """Stable SHA-256 of the training frame's contents."""
+    row_hashes = pd.util.hash_pandas_object(df, index=False).values
+    return hashlib.sha256(row_hashes.tobytes()).hexdigest()
+
+
+def feature_config(vectorizer):
+    """JSON-friendly description of the vectorizer settings."""
+    config = {name: value for name, value in vectorizer.get_params().items() if not callable(value)}
+    config['class'] = type(vectorizer).__name__
+    config['n_features'] = len(getattr(vectorizer, 'vocabulary_', {}))
+    return config
+
+
+def register_model(model, vectorizer, metrics=None, data_hash=None, notes=None,
+                   root=REGISTRY_DIR, promote=True):
+    """Stores a model/vectorizer pair as a new immutable version and optionally makes it current."""
+    version = time.strftime("%Y%m%d-%H%M%S") + f"-{time.time_ns() % 1000000:06d}"
+    version_dir = os.path.join(root, 'versions', version)
+    tmp_dir = version_dir + '.tmp'
+    os.makedirs(tmp_dir)
+
+    joblib.dump(model, os.path.join(tmp_dir, 'model.joblib'))
+    joblib.dump(vectorizer, os.path.join(tmp_dir, 'vectorizer.joblib'))
+    metadata = {
+        'version': version,
+        'created': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'model_class': type(model).__name__,
+        'metrics': metrics or {},
+        'data_hash': data_hash,
+        'feature_config': feature_config(vectorizer),
+        'notes': notes
+    }
+    with open(os.path.join(tmp_dir, 'metadata.json'), 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2, default=_json_default)
+
+    os.replace(tmp_dir, version_dir)
+    if promote:
+        promote_version(version, root)
+    return version
+
+
+def promote_version(version, root=REGISTRY_DIR):
+    """Atomically points CURRENT at an existing version."""
+    if not os.path.isdir(os.path.join(root, 'versions', version)):
+        raise FileNotFoundError(f"Unknown model version: {version}")
+    write_atomic(os.path.join(root, CURRENT_FILE), version)
+
+
+def current_version(root=REGISTRY_DIR):
+    path = os.path.join(root, CURRENT_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read().strip() or None
+
+
+def list_versions(root=REGISTRY_DIR):
+    """Returns the metadata of every registered version, oldest first."""
+    versions_dir = os.path.join(root, 'versions')
+    if not os.path.isdir(versions_dir):
+        return []
+    result = []
+    for version in sorted(os.listdir(versions_dir)):
+        path = os.path.join(versions_dir, version, 'metadata.json')
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                result.append(json.load(f))
+    return result
+
+
+def load_version(version, root=REGISTRY_DIR):
+    """Returns (model, vectorizer, metadata) for a version."""
+    version_dir = os.path.join(root, 'versions', version)
+    model = joblib.load(os.path.join(version_dir, 'model.joblib'))
+    vectorizer = joblib.load(os.path.join(version_dir, 'vectorizer.joblib'))
+    with open(os.path.join(version_dir, 'metadata.json'), 'r', encoding='utf-8') as f:
+        metadata = json.load(f)
+    return model, vectorizer, metadata
+
+
+def warm_up_and_validate(model, vectorizer, texts=WARMUP_TEXTS):
+    """Runs a few predictions so first requests are not slow, and checks the output is sane."""
+    labels, confidences = predict_with_confidence(model, vectorizer, texts)
+    if len(labels) != len(texts):
+        raise ValueError("Model returned the wrong number of predictions")
+    if not set(labels) <= {'male', 'female'}:
+        raise ValueError(f"Unexpected labels: {sorted(set(labels))}")
+    if not all(0 <= c <= 100 for c in confidences):
+        raise ValueError("Confidences out of range")
+
+
+class HotReloadingPredictor:
+    """Serves the registry's current model and swaps in new versions in the background.
+
+    A watcher thread polls CURRENT; a new version is loaded, warmed up and
+    validated off the request path, then published with a single reference
+    assignment. Requests always use one consistent (version, model,
+    vectorizer) snapshot, so none are dropped during a swap.
+    """
+
+    def __init__(self, root=REGISTRY_DIR, poll_interval=2.0):
+        self.root = root
+        self.poll_interval = poll_interval
+        version = current_version(root)
+        if version is None:
+            raise FileNotFoundError(f"No current model in registry '{root}'")
+        self._active = self._prepare(version)
+        self._rejected = set()  # versions that failed validation; not retried on every poll
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._watch, daemon=True)
+        self._thread.start()
+
+    def _prepare(self, version):
+        model, vectorizer, _ = load_version(version, self.root)
+        warm_up_and_validate(model, vectorizer)
+        return version, model, vectorizer
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            self.check_for_update()
+
+    def check_for_update(self):
+        """Loads and swaps in the current version if it changed. Returns True on swap."""
+        version = current_version(self.root)
+        if version is None or version == self._active[0] or version in self._rejected:
+            return False
+        try:
+            prepared = self._prepare(version)
+        except Exception as e:
+            self._rejected.add(version)
+            print(f"Rejected model version {version}: {e}")
+            return False
+        self._active = prepared
+        print(f"Switched to model version {version}")
+        return True
+
+    def snapshot(self):
+        """Returns the (version, model, vectorizer) serving right now."""
+        return self._active
+
+    @property
+    def version(self):
+        return self._active[0]
+
+    def predict(self, texts):
+        _, model, vectorizer = self._active
+        return predict_with_confidence(model, vectorizer, texts)
+
+    def predict_gender(self, text):
+        labels, confidences = self.predict([text])
+        return labels[0], float(confidences[0])
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 2 and sys.argv[1] == 'promote':
+        promote_version(sys.argv[2])
+        print(f"Current model version: {sys.argv[2]}")
+    else:
+        current = current_version()
+        print("Registered model versions:")
+        print("-" * 50)
+        for metadata in list_versions():
+            marker = '*' if metadata['version'] == current else ' '
+            f1 = metadata['metrics'].get('f1')
+            f1_text = f"F1 {f1:.4f}" if f1 is not None else "no metrics"
+            print(f"{marker} {metadata['version']}  {metadata['model_class']}  {f1_text}")
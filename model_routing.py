@@ -0,0 +1,188 @@
+import time
+import joblib
+from sklearn.model_selection import train_test_split, StratifiedKFold
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.metrics import accuracy_score
+
+from utils import load_datasets, predict_with_confidence
+
+# Texts up to this many characters (tweet sized) go to the short route
+SHORT_TEXT_LIMIT = 280
+MIN_ROUTE_SAMPLES = 50
+LATENCY_SAMPLES = 100
+
+
+def route_for(text, limit=SHORT_TEXT_LIMIT):
+    """Cheap length rule deciding which specialised model serves a text."""
+    return 'short' if len(text) <= limit else 'long'
+
+
+def make_route_pipeline(route):
+    """Returns an unfitted (vectorizer, model) pair for the given route."""
+    if route == 'short':
+        # Small vocabulary and Naive Bayes keep short-text scoring fast
+        return TfidfVectorizer(max_features=5000), MultinomialNB()
+    return TfidfVectorizer(sublinear_tf=True), LogisticRegression(max_iter=200)
+
+
+class ModelRouter:
+    def __init__(self, routes, fallback, limit=SHORT_TEXT_LIMIT):
+        self.routes = routes        # route name -> (vectorizer, model)
+        self.fallback = fallback    # combined (vectorizer, model)
+        self.limit = limit
+
+    def route(self, text):
+        name = route_for(text, self.limit)
+        return name if name in self.routes else 'combined'
+
+    def pipeline(self, name):
+        return self.routes.get(name, self.fallback)
+
+    def predict(self, texts):
+        """Predicts a batch, grouping texts per route. Returns (labels, confidences, routes)."""
+        routes = [self.route(text) for text in texts]
+        labels = [None] * len(texts)
+        confidences = [0.0] * len(texts)
+        for name in set(routes):
+            idx = [i for i, r in enumerate(routes) if r == name]
+            vectorizer, model = self.pipeline(name)
+            route_labels, route_conf = predict_with_confidence(model, vectorizer, [texts[i] for i in idx])
+            for i, label, conf in zip(idx, route_labels, route_conf):
+                labels[i] = label
+                confidences[i] = float(conf)
+        return labels, confidences, routes
+
+    def predict_gender(self, text):
+        labels, confidences, routes = self.predict([text])
+        return labels[0], confidences[0]
+
+
+def _fit_router(df, limit, route_names=('short', 'long'), verbose=True):
+    """Fits the combined fallback and a specialist pipeline for each of route_names."""
+    combined_vectorizer = TfidfVectorizer()
+    combined_model = LogisticRegression(max_iter=200)
+    combined_model.fit(combined_vectorizer.fit_transform(df['text']), df['gender'])
+
+    routes = {}
+    df_routes = df['text'].map(lambda text: route_for(text, limit))
+    for name in route_names:
+        subset = df[df_routes == name]
+        # Too little data (or a single class) for a specialist: leave it to the fallback
+        if len(subset) < MIN_ROUTE_SAMPLES or subset['gender'].nunique() < 2:
+            if verbose:
+                print(f"Route '{name}' has too few samples, using combined model.")
+            continue
+        vectorizer, model = make_route_pipeline(name)
+        model.fit(vectorizer.fit_transform(subset['text']), subset['gender'])
+        routes[name] = (vectorizer, model)
+
+    return ModelRouter(routes, (combined_vectorizer, combined_model), limit)
+
+
+def train_router(df, limit=SHORT_TEXT_LIMIT, folds=5):
+    """Fits the combined fallback plus the specialist routes that beat it on held-out data.
+
+    Each candidate route is compared with the combined model over stratified
+    cross-validation folds (a single small split is too noisy to decide on),
+    and only routes with higher held-out accuracy are kept.
+    """
+    correct = {}
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=42)
+    for train_idx, val_idx in splitter.split(df, df['gender']):
+        train_df, val_df = df.iloc[train_idx], df.iloc[val_idx]
+        candidate = _fit_router(train_df, limit, verbose=False)
+        report = evaluate_router(candidate, val_df['text'], val_df['gender'], verbose=False, timing=False)
+        for name in candidate.routes:
+            stats = report.get(name)
+            if stats is None:
+                # No validation texts for this route in this fold
+                continue
+            routed, combined = correct.get(name, (0.0, 0.0))
+            correct[name] = (routed + stats['accuracy'] * stats['samples'],
+                             combined + stats['combined_accuracy'] * stats['samples'])
+
+    keep = []
+    for name, (routed, combined) in correct.items():
+        if routed > combined:
+            keep.append(name)
+        else:
+            print(f"Route '{name}' is not better than the combined model on held-out data "
+                  f"({routed:.0f} vs {combined:.0f} correct), using combined model.")
+
+    # Refit the chosen routes on all the data
+    return _fit_router(df, limit, keep)
+
+
+def _request_latency_ms(model, vectorizer, texts):
+    """Mean latency of single-document predict calls."""
+    texts = texts[:LATENCY_SAMPLES]
+    start = time.perf_counter()
+    for text in texts:
+        predict_with_confidence(model, vectorizer, [text])
+    return (time.perf_counter() - start) * 1000 / len(texts)
+
+
+def evaluate_router(router, texts, y_true, verbose=True, timing=True):
+    """Accuracy and single-request latency per route, against the combined model.
+
+    Latency is the mean time of one-document predict calls (what a caller
+    serving a single request sees), measured on up to LATENCY_SAMPLES texts
+    per route; timing=False skips it.
+    """
+    texts = list(texts)
+    y_true = list(y_true)
+    routes = [router.route(text) for text in texts]
+    combined_vectorizer, combined_model = router.fallback
+    report = {}
+
+    for name in sorted(set(routes)):
+        idx = [i for i, r in enumerate(routes) if r == name]
+        route_texts = [texts[i] for i in idx]
+        route_y = [y_true[i] for i in idx]
+
+        vectorizer, model = router.pipeline(name)
+        routed_pred, _ = predict_with_confidence(model, vectorizer, route_texts)
+        combined_pred, _ = predict_with_confidence(combined_model, combined_vectorizer, route_texts)
+
+        report[name] = {
+            'samples': len(idx),
+            'accuracy': accuracy_score(route_y, routed_pred),
+            'combined_accuracy': accuracy_score(route_y, combined_pred)
+        }
+        if timing:
+            report[name]['latency_ms'] = _request_latency_ms(model, vectorizer, route_texts)
+            report[name]['combined_latency_ms'] = _request_latency_ms(combined_model, combined_vectorizer, route_texts)
+
+    if verbose:
+        print("\nPer-route Performance:")
+        print("-" * 50)
+        for name, stats in report.items():
+            print(f"{name} ({stats['samples']} samples)")
+            routed_latency = f", {stats['latency_ms']:.3f} ms/request" if timing else ""
+            combined_latency = f", {stats['combined_latency_ms']:.3f} ms/request" if timing else ""
+            print(f"  Routed:   accuracy {stats['accuracy']:.4f}{routed_latency}")
+            print(f"  Combined: accuracy {stats['combined_accuracy']:.4f}{combined_latency}")
+    return report
+
+
+if __name__ == "__main__":
+    # Train through the module so the pickle refers to model_routing.ModelRouter, not __main__
+    import model_routing
+
+    df = load_datasets()
+    print("Dataset shape:", df.shape)
+
+    train_df, test_df = train_test_split(df, test_size=0.2, random_state=42, stratify=df['source'])
+
+    print("\nTraining routed models...")
+    router = model_routing.train_router(train_df)
+    model_routing.evaluate_router(router, test_df['text'], test_df['gender'])
+
+    print("\nSaving routed models...")
+    try:
+        joblib.dump(router, 'routed_models.joblib')
+        print("Routed models saved successfully.")
+    except Exception as e:
+        print(f"Error saving routed models: {e}")
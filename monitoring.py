@@ -0,0 +1,262 @@
+import time
+import zlib
+import json
+import math
+import random
+from collections import deque
+
+import numpy as np
+
+CONFIDENCE_BINS = np.linspace(0, 100, 21)
+
+# Drift alert thresholds
+PSI_THRESHOLD = 0.2
+MALE_SHARE_THRESHOLD = 0.15
+OOV_RATE_THRESHOLD = 0.10
+
+# Fewer observations than this are too noisy to alert on
+MIN_ALERT_PREDICTIONS = 100   # per report interval (PSI) and in the sliding window (male share)
+MIN_ALERT_TOKENS = 1000       # sampled tokens in the sliding window (OOV rate)
+
+
+class CountMinSketch:
+    """Approximate token counts in depth x width counters (never underestimates)."""
+
+    def __init__(self, width=2048, depth=4):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+
+    def _columns(self, item):
+        data = item.encode('utf-8')
+        return [zlib.crc32(data, seed) % self.width for seed in range(1, self.depth + 1)]
+
+    def add(self, item, count=1):
+        columns = self._columns(item)
+        self.table[np.arange(self.depth), columns] += count
+        return int(self.table[np.arange(self.depth), columns].min())
+
+    def estimate(self, item):
+        return int(self.table[np.arange(self.depth), self._columns(item)].min())
+
+
+class ReservoirSample:
+    """Uniform sample of at most size items from a stream of unknown length."""
+
+    def __init__(self, size=100, seed=42):
+        self.size = size
+        self.items = []
+        self.seen = 0
+        self.random = random.Random(seed)
+
+    def add(self, item):
+        self.seen += 1
+        if len(self.items) < self.size:
+            self.items.append(item)
+        else:
+            slot = self.random.randrange(self.seen)
+            if slot < self.size:
+                self.items[slot] = item
+
+
+class SlidingWindowRate:
+    """Share of positive events over the last window_size observations."""
+
+    def __init__(self, window_size=1000):
+        self.window = deque(maxlen=window_size)
+        self.positive = 0
+        self.total = 0
+
+    def add(self, positive, total=1):
+        if len(self.window) == self.window.maxlen:
+            old_positive, old_total = self.window[0]
+            self.positive -= old_positive
+            self.total -= old_total
+        self.window.append((positive, total))
+        self.positive += positive
+        self.total += total
+
+    @property
+    def rate(self):
+        return self.positive / self.total if self.total else 0.0
+
+
+def population_stability_index(expected, actual, eps=1e-4):
+    """PSI between two histograms (counts); above ~0.2 is usually treated as drift."""
+    expected = np.asarray(expected, dtype=float)
+    actual = np.asarray(actual, dtype=float)
+    if expected.sum() == 0 or actual.sum() == 0:
+        return 0.0
+    p = np.clip(expected / expected.sum(), eps, None)
+    q = np.clip(actual / actual.sum(), eps, None)
+    return float(((q - p) * np.log(q / p)).sum())
+
+
+class PredictionMonitor:
+    """Constant-memory drift and throughput monitor that sits next to inference.
+
+    Per prediction it updates the confidence histogram (reset after each
+    report, so it reflects the latest interval) and the sliding
+    male/female window; every token_sample_every-th text is also tokenized
+    to track the out-of-vocabulary rate and the most frequent OOV tokens
+    (count-min sketch), keeping the per-prediction overhead small. A report
+    is produced every report_interval seconds, with alerts when the stream
+    drifts from the baseline and a uniform reservoir sample of the tokenized
+    texts seen so far, for inspecting what caused it.
+    """
+
+    def __init__(self, vectorizer, baseline=None, window_size=1000, report_interval=60.0,
+                 token_sample_every=10, top_oov=10, on_report=None, on_alert=None):
+        self.vocabulary = vectorizer.vocabulary_
+        self.analyzer = vectorizer.build_analyzer()
+        self.baseline = baseline
+        self.report_interval = report_interval
+        self.token_sample_every = token_sample_every
+        self.top_oov = top_oov
+        self.on_report = on_report or print_report
+        self.on_alert = on_alert or print_alert
+
+        self.oov_sketch = CountMinSketch()
+        self.oov_candidates = {}
+        self.samples = ReservoirSample()
+        self.confidence_hist = np.zeros(len(CONFIDENCE_BINS) - 1, dtype=np.int64)
+        self.male_share = SlidingWindowRate(window_size)
+        self.oov_rate = SlidingWindowRate(window_size)
+
+        self.total = 0
+        self.interval_count = 0
+        self.start_time = time.monotonic()
+        self.last_report = self.start_time
+
+    def _track_tokens(self, text):
+        oov = 0
+        tokens = self.analyzer(text)
+        for token in tokens:
+            if token not in self.vocabulary:
+                oov += 1
+                estimate = self.oov_sketch.add(token)
+                # Keep only a bounded set of heavy-hitter candidates
+                if token in self.oov_candidates or len(self.oov_candidates) < self.top_oov * 4:
+                    self.oov_candidates[token] = estimate
+                else:
+                    weakest = min(self.oov_candidates, key=self.oov_candidates.get)
+                    if estimate > self.oov_candidates[weakest]:
+                        del self.oov_candidates[weakest]
+                        self.oov_candidates[token] = estimate
+        self.oov_rate.add(oov, len(tokens))
+
+    def observe(self, text, label, confidence):
+        """Records one prediction (confidence in percent)."""
+        self.total += 1
+        self.interval_count += 1
+        self.male_share.add(1 if label == 'male' else 0)
+        self.confidence_hist[min(int(confidence // 5), len(self.confidence_hist) - 1)] += 1
+        if self.total % self.token_sample_every == 0:
+            self._track_tokens(text)
+            self.samples.add(text)
+
+        now = time.monotonic()
+        if now - self.last_report >= self.report_interval:
+            self.emit_report(now)
+
+    def observe_batch(self, texts, labels, confidences):
+        for text, label, confidence in zip(texts, labels, confidences):
+            self.observe(text, label, confidence)
+
+    def top_oov_tokens(self):
+        ranked = sorted(self.oov_candidates.items(), key=lambda item: -item[1])
+        return ranked[:self.top_oov]
+
+    def snapshot(self):
+        """Current statistics, usable as the baseline for a later monitor."""
+        return {
+            'male_share': self.male_share.rate,
+            'oov_rate': self.oov_rate.rate,
+            'confidence_hist': self.confidence_hist.tolist()
+        }
+
+    def check_drift(self):
+        """Returns a list of alert messages comparing the current window with the baseline.
+
+        Each check only runs once it has enough observations (see the
+        MIN_ALERT_* constants), so a quiet interval does not raise alerts.
+        """
+        if not self.baseline:
+            return []
+        alerts = []
+        current = self.snapshot()
+        if self.interval_count >= MIN_ALERT_PREDICTIONS:
+            psi = population_stability_index(self.baseline['confidence_hist'], current['confidence_hist'])
+            if psi > PSI_THRESHOLD:
+                alerts.append(f"Confidence distribution drift: PSI {psi:.3f}")
+        if (self.male_share.total >= MIN_ALERT_PREDICTIONS
+                and abs(current['male_share'] - self.baseline['male_share']) > MALE_SHARE_THRESHOLD):
+            alerts.append(f"Male share {current['male_share']:.1%} vs baseline {self.baseline['male_share']:.1%}")
+        if (self.oov_rate.total >= MIN_ALERT_TOKENS
+                and current['oov_rate'] - self.baseline['oov_rate'] > OOV_RATE_THRESHOLD):
+            alerts.append(f"OOV token rate {current['oov_rate']:.1%} vs baseline {self.baseline['oov_rate']:.1%}")
+        return alerts
+
+    def emit_report(self, now=None):
+        now = now or time.monotonic()
+        elapsed = now - self.last_report
+        report = dict(self.snapshot(),
+                      predictions=self.total,
+                      throughput=self.interval_count / elapsed if elapsed > 0 else 0.0,
+                      top_oov=self.top_oov_tokens(),
+                      samples=list(self.samples.items),
+                      alerts=self.check_drift())
+        self.on_report(report)
+        for alert in report['alerts']:
+            self.on_alert(alert)
+        self.last_report = now
+        self.interval_count = 0
+        self.confidence_hist[:] = 0
+        return report
+
+
+def print_report(report):
+    oov_tokens = ', '.join(token for token, _ in report['top_oov'][:5])
+    print(f"[monitor] {report['predictions']} predictions, {report['throughput']:.1f}/s, "
+          f"male {report['male_share']:.1%}, OOV {report['oov_rate']:.1%}, top OOV: {oov_tokens}")
+
+
+def print_alert(message):
+    print(f"[monitor] ALERT: {message}")
+
+
+def save_baseline(baseline, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2)
+
+
+def load_baseline(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    import joblib
+    import pandas as pd
+    from utils import predict_with_confidence
+
+    model = joblib.load('gender_model.joblib')
+    vectorizer = joblib.load('vectorizer.joblib')
+
+    def stream(path, monitor):
+        texts = pd.read_csv(path, encoding='utf-8')['text'].dropna().astype(str).tolist()
+        labels, confidences = predict_with_confidence(model, vectorizer, texts)
+        start = time.perf_counter()
+        monitor.observe_batch(texts, labels, confidences)
+        overhead_us = (time.perf_counter() - start) * 1e6 / len(texts)
+        print(f"{path}: monitoring overhead {overhead_us:.1f} us/prediction")
+
+    print("Building baseline from blog posts...")
+    reference = PredictionMonitor(vectorizer, token_sample_every=1, report_interval=math.inf)
+    stream('blogtext_reduced.csv', reference)
+    baseline = reference.snapshot()
+
+    print("\nMonitoring a stream of tweets against the blog baseline...")
+    monitor = PredictionMonitor(vectorizer, baseline=baseline, report_interval=math.inf)
+    stream('twitter_reduced.csv', monitor)
+    monitor.emit_report()
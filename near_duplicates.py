@@ -0,0 +1,120 @@
+import re
+import hashlib
+import numpy as np
+
+from utils import preprocess_text
+
+MAX_DISTANCE = 3
+
+# 'urlLink' is the blog corpus's placeholder for removed links
+_URL_RE = re.compile(r'https?://\S+|www\.\S+|\burllink\b')
+_MENTION_RE = re.compile(r'@\w+')
+_NON_WORD_RE = re.compile(r'[^a-z0-9#\s]+')
+
+
+def normalize_for_dedup(text):
+    """Lowercases and strips URLs, mentions, retweet markers and punctuation."""
+    text = _URL_RE.sub(' ', text.lower())
+    text = _MENTION_RE.sub(' ', text)
+    text = _NON_WORD_RE.sub(' ', text)
+    text = re.sub(r'^(rt\s+)+', '', preprocess_text(text))
+    return text
+
+
+def _features(text):
+    words = text.split()
+    # Unique features only, so one repeated word cannot outvote the rest of the text
+    return list(dict.fromkeys(words + [f"{a} {b}" for a, b in zip(words, words[1:])]))
+
+
+def simhash(text):
+    """64-bit SimHash of the normalized text's word unigrams and bigrams (None if empty)."""
+    features = _features(normalize_for_dedup(text))
+    if not features:
+        return None
+    digests = b''.join(hashlib.blake2b(f.encode('utf-8'), digest_size=8).digest() for f in features)
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8)).reshape(len(features), 64)
+    votes = bits.sum(axis=0) * 2 > len(features)
+    return int(''.join('1' if v else '0' for v in votes), 2)
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+class NearDuplicateIndex:
+    """Finds texts whose SimHash is within max_distance bits of one already added.
+
+    The 64 bits are split into max_distance + 1 bands; two fingerprints that
+    differ in at most max_distance bits must agree exactly on at least one
+    band, so only texts sharing a band are compared.
+    """
+
+    def __init__(self, max_distance=MAX_DISTANCE):
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self.band_bits = 64 // self.bands
+        self.tables = [{} for _ in range(self.bands)]
+        self.size = 0
+
+    def _band_keys(self, fingerprint):
+        mask = (1 << self.band_bits) - 1
+        return [(fingerprint >> (i * self.band_bits)) & mask for i in range(self.bands)]
+
+    def _find(self, fingerprint, band_keys):
+        for table, band_key in zip(self.tables, band_keys):
+            for other_fingerprint, key in table.get(band_key, ()):
+                if hamming_distance(fingerprint, other_fingerprint) <= self.max_distance:
+                    return key
+        return None
+
+    def find(self, text):
+        """Returns the key of a near-duplicate already in the index, or None."""
+        fingerprint = simhash(text)
+        if fingerprint is None:
+            return None
+        return self._find(fingerprint, self._band_keys(fingerprint))
+
+    def add(self, key, text):
+        """Adds text under key unless it near-duplicates an indexed text.
+
+        Returns the representative's key for a near-duplicate (which is not
+        added), otherwise None.
+        """
+        fingerprint = simhash(text)
+        if fingerprint is None:
+            return None
+        band_keys = self._band_keys(fingerprint)
+        representative = self._find(fingerprint, band_keys)
+        if representative is not None:
+            return representative
+        for table, band_key in zip(self.tables, band_keys):
+            table.setdefault(band_key, []).append((fingerprint, key))
+        self.size += 1
+        return None
+
+
+def find_duplicates(texts, max_distance=MAX_DISTANCE):
+    """Returns a list giving, for each text, the index of its representative (None if unique)."""
+    index = NearDuplicateIndex(max_distance)
+    return [index.add(i, text) for i, text in enumerate(texts)]
+
+
+def drop_near_duplicates(df, text_column='text', max_distance=MAX_DISTANCE):
+    """Keeps the first of each group of near-duplicate rows."""
+    representatives = find_duplicates(df[text_column].astype(str), max_distance)
+    keep = [rep is None for rep in representatives]
+    return df[keep]
+
+
+if __name__ == "__main__":
+    import pandas as pd
+
+    for path in ('twitter_reduced.csv', 'blogtext_reduced.csv'):
+        df = pd.read_csv(path, encoding='utf-8').dropna(subset=['text'])
+        representatives = find_duplicates(df['text'].astype(str))
+        duplicates = [(i, rep) for i, rep in enumerate(representatives) if rep is not None]
+        print(f"\n{path}: {len(duplicates)} near-duplicates in {len(df)} texts")
+        for i, rep in duplicates[:3]:
+            print(f"  {df['text'].iloc[i][:60]!r}")
+            print(f"    ~ {df['text'].iloc[rep][:60]!r}")
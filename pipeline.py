@@ -0,0 +1,288 @@
+import csv
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
+
+import pandas as pd
+
+from utils import preprocess_text, sentiment_label, analyze_mood
+from near_duplicates import NearDuplicateIndex
+from calibration import predicted_label_confidences
+from explain import get_explainer
+
+_DONE = object()
+
+OUTPUT_FIELDS = ['row', 'text', 'gender', 'confidence', 'top_terms', 'sentiment', 'polarity', 'subjectivity', 'mood',
+                 'duplicate_of']
+RESULT_FIELDS = OUTPUT_FIELDS[2:-1]
+
+
+class StageStats:
+    def __init__(self, name, concurrency):
+        self.name = name
+        self.concurrency = concurrency
+        self.items = 0
+        self.batches = 0
+        self.busy = 0.0       # seconds spent doing the stage's work
+        self.starved = 0.0    # seconds waiting for input from upstream
+        self.blocked = 0.0    # seconds waiting for room downstream (backpressure)
+
+    def report(self, elapsed):
+        throughput = self.items / elapsed if elapsed else 0.0
+        utilisation = self.busy / (elapsed * self.concurrency) if elapsed else 0.0
+        return (f"{self.name:<10} x{self.concurrency}  {self.items:>7} items  {throughput:>9.1f} items/s  "
+                f"busy {utilisation:>6.1%}  starved {self.starved:>6.2f}s  blocked {self.blocked:>6.2f}s")
+
+
+class Stage:
+    """One pipeline step: func(batch) -> batch, run on an executor with its own concurrency."""
+
+    def __init__(self, name, func, concurrency=1, use_processes=False):
+        self.name = name
+        self.func = func
+        self.concurrency = concurrency
+        self.use_processes = use_processes
+        self.stats = StageStats(name, concurrency)
+
+    def make_executor(self):
+        if self.use_processes:
+            return ProcessPoolExecutor(max_workers=self.concurrency)
+        return ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix=self.name)
+
+
+async def _timed_put(queue, item, stats):
+    start = time.perf_counter()
+    await queue.put(item)
+    stats.blocked += time.perf_counter() - start
+
+
+async def _read(batches, out_queue, stats, executor):
+    loop = asyncio.get_running_loop()
+    iterator = iter(batches)
+    seq = 0
+    while True:
+        start = time.perf_counter()
+        batch = await loop.run_in_executor(executor, next, iterator, _DONE)
+        stats.busy += time.perf_counter() - start
+        if batch is _DONE:
+            break
+        stats.items += len(batch)
+        stats.batches += 1
+        await _timed_put(out_queue, (seq, batch), stats)
+        seq += 1
+    await out_queue.put(_DONE)
+
+
+async def _work(stage, in_queue, out_queue, executor):
+    loop = asyncio.get_running_loop()
+    stats = stage.stats
+    while True:
+        start = time.perf_counter()
+        item = await in_queue.get()
+        stats.starved += time.perf_counter() - start
+        if item is _DONE:
+            # Let sibling workers see the end of the stream too
+            await in_queue.put(_DONE)
+            return
+        seq, batch = item
+        start = time.perf_counter()
+        batch = await loop.run_in_executor(executor, stage.func, batch)
+        stats.busy += time.perf_counter() - start
+        stats.items += len(batch)
+        stats.batches += 1
+        await _timed_put(out_queue, (seq, batch), stats)
+
+
+async def _write(sink, in_queue, stats, executor):
+    """Calls sink(batch) in input order, buffering batches that finish early."""
+    loop = asyncio.get_running_loop()
+    pending = {}
+    next_seq = 0
+    while True:
+        start = time.perf_counter()
+        item = await in_queue.get()
+        stats.starved += time.perf_counter() - start
+        if item is _DONE:
+            break
+        seq, batch = item
+        pending[seq] = batch
+        while next_seq in pending:
+            batch = pending.pop(next_seq)
+            start = time.perf_counter()
+            await loop.run_in_executor(executor, sink, batch)
+            stats.busy += time.perf_counter() - start
+            stats.items += len(batch)
+            stats.batches += 1
+            next_seq += 1
+
+
+async def run_pipeline(batches, stages, sink, queue_size=4):
+    """Streams batches through the stages into sink, overlapping every step.
+
+    Reading (iterating batches), each stage and writing (sink) run
+    concurrently; bounded queues of queue_size batches between them give
+    backpressure, so a slow stage throttles its upstream instead of
+    buffering the whole input. Returns the list of StageStats.
+    """
+    reader_stats = StageStats('read', 1)
+    writer_stats = StageStats('write', 1)
+    queues = [asyncio.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)]
+    executors = [stage.make_executor() for stage in stages]
+    io_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='io')
+
+    async def run_stage(stage, executor, in_queue, out_queue):
+        await asyncio.gather(*[_work(stage, in_queue, out_queue, executor) for _ in range(stage.concurrency)])
+        await out_queue.put(_DONE)
+
+    try:
+        await asyncio.gather(
+            _read(batches, queues[0], reader_stats, io_executor),
+            *[run_stage(stage, executor, queues[i], queues[i + 1])
+              for i, (stage, executor) in enumerate(zip(stages, executors))],
+            _write(sink, queues[-1], writer_stats, io_executor)
+        )
+    finally:
+        for executor in executors:
+            executor.shutdown()
+        io_executor.shutdown()
+
+    return [reader_stats] + [stage.stats for stage in stages] + [writer_stats]
+
+
+def score_gender(model, vectorizer, records):
+    to_score = [record for record in records if 'duplicate_of' not in record]
+    if not to_score:
+        return records
+    X = vectorizer.transform([record['text'] for record in to_score])
+    labels, confidences = predicted_label_confidences(model, X)
+    explainer = get_explainer(model, vectorizer)
+    explanations = explainer.explain(X) if explainer else [None] * len(to_score)
+    for record, label, confidence, explanation in zip(to_score, labels, confidences, explanations):
+        record['gender'] = label
+        record['confidence'] = round(float(confidence), 2)
+        if explanation is not None:
+            record['top_terms'] = explainer.format(explanation)
+    return records
+
+
+def score_sentiment(records):
+    """TextBlob sentiment and mood; module level so it can run in worker processes."""
+    from textblob import TextBlob
+
+    for record in records:
+        if 'duplicate_of' in record:
+            continue
+        sentiment = TextBlob(record['text']).sentiment
+        record['polarity'] = round(sentiment.polarity, 4)
+        record['subjectivity'] = round(sentiment.subjectivity, 4)
+        record['sentiment'] = sentiment_label(sentiment.polarity)
+        record['mood'] = analyze_mood(record['text'], sentiment.polarity, sentiment.subjectivity)
+    return records
+
+
+def read_batches(path, batch_size):
+    """Yields lists of {'row': ..., 'text': ...} records from a CSV with a 'text' column.
+
+    row is the 0-based data row in the input CSV, so results and
+    duplicate_of references join back to the input; rows without text
+    are skipped.
+    """
+    for chunk in pd.read_csv(path, encoding='utf-8', chunksize=batch_size):
+        texts = chunk['text'].dropna().astype(str)
+        yield [{'row': int(row), 'text': preprocess_text(text)} for row, text in texts.items()]
+
+
+def mark_duplicates(batches, index):
+    """Flags records that near-duplicate an earlier one so scoring stages skip them."""
+    for batch in batches:
+        for record in batch:
+            representative = index.add(record['row'], record['text'])
+            if representative is not None:
+                record['duplicate_of'] = representative
+        yield batch
+
+
+class DuplicateFiller:
+    """Sink wrapper copying each representative's results onto its near-duplicates.
+
+    The writer sees records in input order and a representative always
+    precedes its duplicates, so its results are cached by the time they
+    are needed.
+    """
+
+    def __init__(self, sink):
+        self.sink = sink
+        self.results = {}
+        self.duplicates = 0
+
+    def __call__(self, records):
+        for record in records:
+            if 'duplicate_of' in record:
+                record.update(self.results[record['duplicate_of']])
+                self.duplicates += 1
+            else:
+                self.results[record['row']] = {field: record.get(field) for field in RESULT_FIELDS}
+        self.sink(records)
+
+
+def monitored_sink(sink, monitor):
+    """Wraps sink so every written record is also fed to a PredictionMonitor."""
+    def write(records):
+        monitor.observe_batch([record['text'] for record in records],
+                              [record.get('gender') for record in records],
+                              [record.get('confidence', 0.0) for record in records])
+        sink(records)
+    return write
+
+
+def analyze_file(input_path, output_path, model, vectorizer, batch_size=256,
+                 gender_workers=1, sentiment_workers=2, queue_size=4, skip_duplicates=True,
+                 monitor=None):
+    """Runs gender, sentiment and mood analysis over a CSV and writes the results to another CSV.
+
+    Each output row carries the input's data row number in the row column.
+    With skip_duplicates, near-duplicate texts reuse the first occurrence's
+    results and are flagged in the duplicate_of column. An optional
+    PredictionMonitor sees every prediction as it is written.
+    """
+    stages = [
+        Stage('gender', partial(score_gender, model, vectorizer), gender_workers),
+        Stage('sentiment', score_sentiment, sentiment_workers, use_processes=True)
+    ]
+    start = time.perf_counter()
+    with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=OUTPUT_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        batches = read_batches(input_path, batch_size)
+        sink = writer.writerows
+        if monitor is not None:
+            sink = monitored_sink(sink, monitor)
+        if skip_duplicates:
+            batches = mark_duplicates(batches, NearDuplicateIndex())
+            sink = DuplicateFiller(sink)
+        stats = asyncio.run(run_pipeline(batches, stages, sink, queue_size))
+    elapsed = time.perf_counter() - start
+
+    print(f"\nPipeline finished in {elapsed:.2f}s")
+    print("-" * 50)
+    for stage_stats in stats:
+        print(stage_stats.report(elapsed))
+    bottleneck = max(stats, key=lambda s: s.busy / s.concurrency)
+    print(f"Bottleneck: {bottleneck.name}")
+    if skip_duplicates:
+        print(f"Near-duplicates reusing earlier results: {sink.duplicates}")
+    return stats
+
+
+if __name__ == "__main__":
+    import sys
+    import joblib
+
+    input_path = sys.argv[1] if len(sys.argv) > 1 else 'twitter_reduced.csv'
+    output_path = sys.argv[2] if len(sys.argv) > 2 else 'analysis_results.csv'
+
+    model = joblib.load('gender_model.joblib')
+    vectorizer = joblib.load('vectorizer.joblib')
+    analyze_file(input_path, output_path, model, vectorizer)
+    print(f"Results saved to {output_path}")
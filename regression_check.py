@@ -0,0 +1,348 @@
+import os
+import sys
+import json
+import time
+import tempfile
+import tracemalloc
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.svm import LinearSVC
+
+from utils import DATASET_PATHS, load_datasets, predict_with_confidence
+from calibration import calibrate_model, predict_probabilities
+
+SAMPLE_SIZE = 200
+SAMPLE_SEED = 0
+FIXTURE_SEED = 42
+GOLDEN_PATH = 'golden_outputs.json'
+
+# Largest allowed confidence difference from the reference path, in percentage points
+CONFIDENCE_TOLERANCE = 1e-4
+BACKEND_TOLERANCE = {'pipeline': 0.006}  # the pipeline rounds confidences to 2 decimals
+GOLDEN_TOLERANCE = 0.01    # golden outputs may come from another numpy/scikit-learn build
+
+# Share of multi-window documents whose early-stopped label must match scoring every window
+LONG_TEXT_MIN_AGREEMENT = 0.95
+
+# Performance limits, loose enough for a plain Linux box but tight enough to catch regressions
+MIN_THROUGHPUT = {         # documents per second over the whole sample
+    'reference': 500,
+    'utils': 500,
+    'long_text': 100,
+    'shared_model': 200,
+    'registry': 500,
+    'pipeline': 300
+}
+MAX_P95_LATENCY_MS = 50    # single-document calls
+MAX_PEAK_MEMORY_MB = 100   # Python allocations during one batch call
+LATENCY_SAMPLES = 50
+
+
+def load_samples():
+    """Fixed sample of each bundled corpus. Returns (texts, sample row indices per source)."""
+    texts = []
+    indices = {}
+    for source, path in DATASET_PATHS.items():
+        df = pd.read_csv(path, encoding='utf-8').dropna(subset=['text'])
+        sample = df.sample(n=min(SAMPLE_SIZE, len(df)), random_state=SAMPLE_SEED)
+        indices[source] = [int(i) for i in sample.index]
+        texts.extend(sample['text'].astype(str))
+    return texts, indices
+
+
+def load_long_texts():
+    """Bundled blog posts spanning more than two long_text windows."""
+    from long_text import WINDOW_CHARS
+
+    texts = pd.read_csv(DATASET_PATHS['blog'], encoding='utf-8')['text'].dropna().astype(str)
+    return [text for text in texts if len(text) > 2 * WINDOW_CHARS]
+
+
+def build_fixtures():
+    """Fits the pinned fixture models on the bundled data with fixed seeds.
+
+    The recipes follow the training scripts: one TF-IDF vectorizer, an
+    80/20 split and, for LinearSVC, Platt calibration on 10% of the
+    training rows. Returns {name: (model, vectorizer)}.
+    """
+    df = load_datasets()
+    vectorizer = TfidfVectorizer()
+    X = vectorizer.fit_transform(df['text'])
+    X_train, _, y_train, _ = train_test_split(X, df['gender'], test_size=0.2, random_state=FIXTURE_SEED)
+
+    logistic = LogisticRegression(max_iter=200).fit(X_train, y_train)
+
+    X_fit, X_calib, y_fit, y_calib = train_test_split(X_train, y_train, test_size=0.1, random_state=FIXTURE_SEED)
+    svc = LinearSVC(random_state=FIXTURE_SEED).fit(X_fit, y_fit)
+    calibrated_svc = calibrate_model(svc, X_calib, y_calib, 'sigmoid')
+
+    return {
+        'logistic_regression': (logistic, vectorizer),
+        'calibrated_linear_svc': (calibrated_svc, vectorizer)
+    }
+
+
+def reference_predict(model, vectorizer, texts):
+    """The plain sklearn path: transform, predict, probability of the predicted label."""
+    X = vectorizer.transform(texts)
+    labels = model.predict(X)
+    probabilities = predict_probabilities(model, X)
+    return labels, probabilities[np.arange(len(labels)), np.searchsorted(model.classes_, labels)] * 100
+
+
+def build_backends(model, vectorizer, workdir):
+    """Every inference path, each as texts -> (labels, confidences in percent)."""
+    from long_text import predict_gender_long
+    from shared_model import publish, SharedModelClient
+    from model_registry import register_model, HotReloadingPredictor
+    from pipeline import score_gender
+
+    def long_text_backend(texts):
+        # One window per text, so the result must match scoring the whole text at once
+        results = [predict_gender_long(model, vectorizer, text, window_chars=10 ** 9, min_windows=1)
+                   for text in texts]
+        return [r[0] for r in results], [r[1] for r in results]
+
+    shared_root = os.path.join(workdir, 'shared_model')
+    publish(model, vectorizer, root=shared_root)
+    shared_client = SharedModelClient(shared_root)
+
+    registry_root = os.path.join(workdir, 'model_registry')
+    register_model(model, vectorizer, root=registry_root)
+    predictor = HotReloadingPredictor(root=registry_root, poll_interval=3600)
+
+    def pipeline_backend(texts):
+        records = score_gender(model, vectorizer, [{'text': text} for text in texts])
+        return [r['gender'] for r in records], [r['confidence'] for r in records]
+
+    backends = {
+        'reference': lambda texts: reference_predict(model, vectorizer, texts),
+        'utils': lambda texts: predict_with_confidence(model, vectorizer, texts),
+        'long_text': long_text_backend,
+        'shared_model': shared_client.predict,
+        'registry': predictor.predict,
+        'pipeline': pipeline_backend
+    }
+
+    def close():
+        shared_client.close()
+        predictor.stop()
+
+    return backends, close
+
+
+def check_agreement(name, labels, confidences, ref_labels, ref_confidences, tolerance=None):
+    """Returns a list of failure messages for label or confidence mismatches."""
+    failures = []
+    labels = np.asarray(labels)
+    mismatched = np.flatnonzero(labels != ref_labels)
+    if len(mismatched):
+        failures.append(f"{name}: {len(mismatched)} labels differ from reference (first at sample {mismatched[0]})")
+    diff = np.abs(np.asarray(confidences, dtype=float) - ref_confidences)
+    if tolerance is None:
+        tolerance = BACKEND_TOLERANCE.get(name, CONFIDENCE_TOLERANCE)
+    if diff.max() > tolerance:
+        failures.append(f"{name}: confidence differs by up to {diff.max():.6f} (tolerance {tolerance})")
+    return failures
+
+
+def check_explanations(model, vectorizer, texts):
+    """Term contributions plus the intercept must add up to the model's decision score."""
+    from explain import get_explainer
+
+    explainer = get_explainer(model, vectorizer)
+    if explainer is None or not hasattr(model, 'decision_function'):
+        return []
+    X = vectorizer.transform(texts)
+    explanations = explainer.explain(X, k=X.shape[1])
+    totals = np.array([sum(c for _, c in explanation) for explanation in explanations])
+    scores = np.asarray(model.decision_function(X)).ravel()
+    offset = scores - totals
+    if np.ptp(offset) > 1e-6:
+        return [f"explain: contributions disagree with decision_function by up to {np.ptp(offset):.2e}"]
+    return []
+
+
+def check_long_text(model, vectorizer, texts):
+    """Checks predict_gender_long on documents that span several windows.
+
+    Without early stopping the label must equal the summed per-window
+    decision scores and the confidence the summed per-window
+    log-probabilities, both computed directly; with the default threshold the
+    early-stopped labels must agree with scoring every window on at least
+    LONG_TEXT_MIN_AGREEMENT of the documents.
+    """
+    from long_text import predict_gender_long, iter_windows
+
+    if not texts:
+        return []
+    failures = []
+    labels, confidences, expected_labels, expected_confidences = [], [], [], []
+    for text in texts:
+        label, confidence, windows = predict_gender_long(model, vectorizer, text, threshold=2.0)
+        window_texts = list(iter_windows(text))
+        if windows != len(window_texts):
+            failures.append(f"long_text: used {windows} of {len(window_texts)} windows without early stopping")
+        X = vectorizer.transform(window_texts)
+        evidence = np.log(np.clip(predict_probabilities(model, X), 1e-12, 1.0)).sum(axis=0)
+        posterior = np.exp(evidence - evidence.max())
+        posterior /= posterior.sum()
+        if hasattr(model, 'decision_function'):
+            # Labels follow the summed decision scores, like model.predict on a single window
+            margin = np.asarray(model.decision_function(X)).sum(axis=0)
+            best = int(margin > 0) if np.ndim(margin) == 0 else int(margin.argmax())
+        else:
+            best = int(posterior.argmax())
+        labels.append(label)
+        confidences.append(confidence)
+        expected_labels.append(model.classes_[best])
+        expected_confidences.append(posterior[best] * 100)
+    failures += check_agreement('long_text windows', labels, confidences,
+                                np.asarray(expected_labels), np.asarray(expected_confidences))
+
+    early = [predict_gender_long(model, vectorizer, text) for text in texts]
+    agreement = np.mean([result[0] == label for result, label in zip(early, labels)])
+    stopped = sum(result[2] < len(list(iter_windows(text))) for result, text in zip(early, texts))
+    print(f"long_text: {len(texts)} multi-window documents, {stopped} stopped early, "
+          f"{agreement:.1%} agree with scoring every window")
+    if agreement < LONG_TEXT_MIN_AGREEMENT:
+        failures.append(f"long_text early stop: {agreement:.1%} label agreement "
+                        f"(minimum {LONG_TEXT_MIN_AGREEMENT:.0%})")
+    return failures
+
+
+def measure(predict, texts):
+    """Returns (documents/s over the batch, p95 single-document latency in ms, peak MB)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    predict(texts)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = []
+    for text in texts[:LATENCY_SAMPLES]:
+        start = time.perf_counter()
+        predict([text])
+        latencies.append((time.perf_counter() - start) * 1000)
+    return len(texts) / elapsed, float(np.percentile(latencies, 95)), peak / 1e6
+
+
+def check_performance(name, throughput, p95_ms, peak_mb):
+    failures = []
+    floor = MIN_THROUGHPUT.get(name)
+    if floor is not None and throughput < floor:
+        failures.append(f"{name}: throughput {throughput:.0f} docs/s below floor {floor}")
+    if p95_ms > MAX_P95_LATENCY_MS:
+        failures.append(f"{name}: p95 latency {p95_ms:.2f} ms above ceiling {MAX_P95_LATENCY_MS}")
+    if peak_mb > MAX_PEAK_MEMORY_MB:
+        failures.append(f"{name}: peak memory {peak_mb:.1f} MB above cap {MAX_PEAK_MEMORY_MB}")
+    return failures
+
+
+def load_golden():
+    if not os.path.exists(GOLDEN_PATH):
+        return None
+    with open(GOLDEN_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def check_golden(golden, name, indices, labels, confidences):
+    """Compares a fixture's reference outputs with the saved golden outputs."""
+    if golden is None:
+        return [f"golden: no {GOLDEN_PATH}; run with --update-golden to pin the current outputs"]
+    if golden['samples'] != indices:
+        return ["golden: sample rows changed; regenerate with --update-golden"]
+    if name not in golden['fixtures']:
+        return [f"golden: no outputs pinned for {name}; regenerate with --update-golden"]
+    pinned = golden['fixtures'][name]
+    return check_agreement(f"golden {name}", pinned['labels'], pinned['confidences'],
+                           np.asarray(labels), np.asarray(confidences), tolerance=GOLDEN_TOLERANCE)
+
+
+def save_golden(indices, outputs):
+    """outputs maps fixture name -> (model, labels, confidences)."""
+    golden = {
+        'created': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'samples': indices,
+        'fixtures': {
+            name: {
+                'model_class': type(model).__name__,
+                'labels': [str(label) for label in labels],
+                'confidences': [round(float(c), 6) for c in confidences]
+            }
+            for name, (model, labels, confidences) in outputs.items()
+        }
+    }
+    with open(GOLDEN_PATH, 'w', encoding='utf-8') as f:
+        json.dump(golden, f)
+    print(f"Golden outputs saved to {GOLDEN_PATH}.")
+
+
+def check_backends(model, vectorizer, texts, ref_labels, ref_confidences, check_perf):
+    failures = []
+    with tempfile.TemporaryDirectory() as workdir:
+        backends, close = build_backends(model, vectorizer, workdir)
+        try:
+            print(f"Checking {len(backends)} backends on {len(texts)} golden samples:")
+            print("-" * 50)
+            for name, predict in backends.items():
+                labels, confidences = predict(texts)
+                backend_failures = check_agreement(name, labels, confidences, ref_labels, ref_confidences)
+                if check_perf:
+                    throughput, p95_ms, peak_mb = measure(predict, texts)
+                    backend_failures += check_performance(name, throughput, p95_ms, peak_mb)
+                    perf = f"{throughput:>8.0f} docs/s  p95 {p95_ms:6.2f} ms  peak {peak_mb:6.1f} MB"
+                else:
+                    perf = ""
+                status = "FAIL" if backend_failures else "OK"
+                print(f"{name:<13} {status:<5} {perf}")
+                failures += backend_failures
+        finally:
+            close()
+    return failures
+
+
+def main(argv):
+    """Checks the fixture models (and, with --artifacts, the saved joblib files) on every path."""
+    texts, indices = load_samples()
+    long_texts = load_long_texts()
+    models = build_fixtures()
+    if '--artifacts' in argv:
+        import joblib
+        models['artifacts'] = (joblib.load('gender_model.joblib'), joblib.load('vectorizer.joblib'))
+
+    references = {name: reference_predict(model, vectorizer, texts)
+                  for name, (model, vectorizer) in models.items()}
+    if '--update-golden' in argv:
+        save_golden(indices, {name: (models[name][0],) + references[name]
+                              for name in models if name != 'artifacts'})
+    golden = load_golden()
+
+    failures = []
+    for name, (model, vectorizer) in models.items():
+        print(f"\n=== {name} ({type(model).__name__}) ===")
+        ref_labels, ref_confidences = references[name]
+        model_failures = []
+        if name != 'artifacts':
+            model_failures += check_golden(golden, name, indices, ref_labels, ref_confidences)
+        model_failures += check_explanations(model, vectorizer, texts)
+        model_failures += check_long_text(model, vectorizer, long_texts)
+        model_failures += check_backends(model, vectorizer, texts, ref_labels, ref_confidences,
+                                         '--skip-perf' not in argv)
+        failures += [f"[{name}] {failure}" for failure in model_failures]
+
+    if failures:
+        print("\nRegression check FAILED:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("\nAll regression checks passed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
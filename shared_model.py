@@ -0,0 +1,392 @@
+import os
+import json
+import time
+import shutil
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+from calibration import CalibratedLinearModel
+from utils import write_atomic
+
+SHARED_DIR = 'shared_model'
+CURRENT_FILE = 'CURRENT'
+ARRAY_NAMES = ('terms', 'long_terms', 'idf', 'weights', 'bias', 'table_x', 'table_y')
+
+# Terms up to this many UTF-8 bytes share one fixed-width array; the rare longer
+# ones (URLs, run-together words) go to a second array so they do not widen it
+SHORT_TERM_BYTES = 16
+
+# Vectorizer settings needed to rebuild the analyzer in consumer processes
+ANALYZER_PARAMS = ('analyzer', 'lowercase', 'strip_accents', 'token_pattern',
+                   'ngram_range', 'stop_words', 'encoding', 'decode_error')
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def export_arrays(model, vectorizer):
+    """Flattens a TF-IDF vectorizer and linear model into plain arrays plus JSON metadata.
+
+    The vocabulary becomes sorted fixed-width bytes arrays, so consumers can
+    map it read-only and look tokens up with np.searchsorted instead of each
+    holding their own dict. Terms longer than SHORT_TERM_BYTES are kept in a
+    separate array (their columns follow the short terms), so a single long
+    token does not set the width of the whole vocabulary.
+    """
+    if not isinstance(vectorizer, TfidfVectorizer):
+        raise ValueError("Only TfidfVectorizer artifacts can be shared")
+    params = vectorizer.get_params()
+    if params['tokenizer'] or params['preprocessor'] or callable(params['analyzer']):
+        raise ValueError("Vectorizers with custom callables cannot be shared")
+
+    calibration = {'method': None}
+    table_x = table_y = np.zeros(0)
+    if isinstance(model, CalibratedLinearModel):
+        calibration = {'method': model.method, 'slope': model.slope, 'intercept': model.intercept}
+        if model.method == 'isotonic':
+            table_x, table_y = np.asarray(model.table_x), np.asarray(model.table_y)
+        model = model.model
+
+    if hasattr(model, 'feature_log_prob_'):
+        # Multinomial NB is linear in the features: jll = X @ log_prob.T + log_prior
+        kind = 'multinomial'
+        weights, bias = model.feature_log_prob_, model.class_log_prior_
+    elif hasattr(model, 'coef_'):
+        kind = 'linear'
+        weights, bias = model.coef_, model.intercept_
+    else:
+        raise ValueError(f"Unsupported model type: {type(model).__name__}")
+
+    vocabulary = vectorizer.vocabulary_
+    encoded = sorted((term.encode('utf-8'), index) for term, index in vocabulary.items())
+    short = [(term, index) for term, index in encoded if len(term) <= SHORT_TERM_BYTES]
+    long = [(term, index) for term, index in encoded if len(term) > SHORT_TERM_BYTES]
+    order = np.array([index for _, index in short + long], dtype=np.int64)
+
+    meta = {
+        'kind': kind,
+        'classes': [str(c) for c in model.classes_],
+        'calibration': calibration,
+        'analyzer_params': {name: params[name] for name in ANALYZER_PARAMS},
+        'norm': params['norm'],
+        'sublinear_tf': params['sublinear_tf'],
+        'binary': params['binary']
+    }
+    arrays = {
+        'terms': np.array([term for term, _ in short], dtype='S' + str(max([len(t) for t, _ in short] + [1]))),
+        'long_terms': np.array([term for term, _ in long], dtype='S' + str(max([len(t) for t, _ in long] + [1]))),
+        'idf': vectorizer.idf_[order] if params['use_idf'] else np.ones(len(order)),
+        'weights': np.ascontiguousarray(np.atleast_2d(weights)[:, order], dtype=np.float64),
+        'bias': np.atleast_1d(np.asarray(bias, dtype=np.float64)),
+        'table_x': table_x,
+        'table_y': table_y
+    }
+    return arrays, meta
+
+
+def publish(model, vectorizer, root=SHARED_DIR, version=None):
+    """Writes a new version under root and atomically points CURRENT at it."""
+    arrays, meta = export_arrays(model, vectorizer)
+    version = version or f"v{time.time_ns()}"
+    version_dir = os.path.join(root, version)
+    if os.path.exists(version_dir):
+        raise ValueError(f"Version {version} already exists in {root}")
+    tmp_dir = version_dir + '.tmp'
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), array)
+        meta['version'] = version
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        os.makedirs(os.path.join(tmp_dir, 'leases'), exist_ok=True)
+        os.replace(tmp_dir, version_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    write_atomic(os.path.join(root, CURRENT_FILE), version)
+    return version
+
+
+def current_version(root=SHARED_DIR):
+    with open(os.path.join(root, CURRENT_FILE), 'r', encoding='utf-8') as f:
+        return f.read().strip()
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def live_leases(version_dir):
+    """Counts leases held by running processes, removing ones left by dead processes."""
+    lease_dir = os.path.join(version_dir, 'leases')
+    if not os.path.isdir(lease_dir):
+        return 0
+    count = 0
+    for name in os.listdir(lease_dir):
+        pid = int(name.split('-')[0])
+        if _pid_alive(pid):
+            count += 1
+        else:
+            os.remove(os.path.join(lease_dir, name))
+    return count
+
+
+def cleanup(root=SHARED_DIR):
+    """Deletes old versions that no consumer process still references."""
+    current = current_version(root)
+    removed = []
+    for version in os.listdir(root):
+        version_dir = os.path.join(root, version)
+        if version == current or not os.path.isdir(version_dir) or version.endswith('.tmp'):
+            continue
+        if live_leases(version_dir) == 0:
+            shutil.rmtree(version_dir, ignore_errors=True)
+            removed.append(version)
+    return removed
+
+
+def _lookup(terms, tokens, rows):
+    """Finds tokens in the sorted fixed-width array terms. Returns (rows, columns) of the hits."""
+    if len(terms) == 0 or len(tokens) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    tokens = tokens.astype(terms.dtype)
+    cols = np.minimum(np.searchsorted(terms, tokens), len(terms) - 1)
+    found = terms[cols] == tokens
+    return rows[found], cols[found]
+
+
+class SharedModelClient:
+    """Read-only, memory-mapped view of the published model.
+
+    Every process opening the same version maps the same pages, so adding
+    workers does not add copies of the vocabulary or coefficients. The
+    CURRENT pointer is re-checked every check_interval seconds and a newly
+    published version is swapped in between calls.
+    """
+
+    def __init__(self, root=SHARED_DIR, check_interval=1.0):
+        self.root = root
+        self.check_interval = check_interval
+        self.version = None
+        self.lease_path = None
+        self.last_check = 0.0
+        self._rejected = set()  # versions that failed to load; not retried on every check
+        self._open()
+
+    def _lease(self):
+        """Leases the current version and returns (version, lease_path).
+
+        cleanup() only deletes versions that are not current, so a lease
+        taken while CURRENT still names the version keeps it on disk. If
+        CURRENT moved while leasing (the version may already be gone), the
+        lease is dropped and the new current version is tried instead.
+        """
+        while True:
+            version = current_version(self.root)
+            lease_path = os.path.join(self.root, version, 'leases', f"{os.getpid()}-{id(self)}")
+            try:
+                open(lease_path, 'w').close()
+            except FileNotFoundError:
+                if current_version(self.root) == version:
+                    raise
+                continue
+            if current_version(self.root) == version:
+                return version, lease_path
+            os.remove(lease_path)
+
+    def _open(self):
+        """Leases and maps the current version, then drops the lease on the previous one."""
+        version, lease_path = self._lease()
+        if version == self.version:
+            self.last_check = time.monotonic()
+            return False
+        try:
+            version_dir = os.path.join(self.root, version)
+            with open(os.path.join(version_dir, 'meta.json'), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            arrays = {name: np.load(os.path.join(version_dir, f"{name}.npy"), mmap_mode='r')
+                      for name in ARRAY_NAMES}
+            params = dict(meta['analyzer_params'])
+            params['ngram_range'] = tuple(params['ngram_range'])
+            analyzer = TfidfVectorizer(**params).build_analyzer()
+        except Exception:
+            os.remove(lease_path)
+            raise
+
+        # The new lease is taken before dropping the old one so cleanup never sees zero
+        self.release()
+        self.analyzer = analyzer
+        self.meta = meta
+        self.arrays = arrays
+        self.classes_ = np.array(meta['classes'])
+        self.version = version
+        self.lease_path = lease_path
+        self.last_check = time.monotonic()
+        return True
+
+    def refresh(self):
+        """Swaps to the latest published version if CURRENT has moved.
+
+        If the new version cannot be loaded the client keeps serving the one
+        it already has and remembers the failure, so that version is not
+        retried (or reported again) until CURRENT moves on.
+        """
+        self.last_check = time.monotonic()
+        version = None
+        try:
+            version = current_version(self.root)
+            if version == self.version or version in self._rejected:
+                return False
+            return self._open()
+        except (OSError, ValueError) as e:
+            if version is not None:
+                self._rejected.add(version)
+            print(f"Could not load shared model version {version}, keeping version {self.version}: {e}")
+            return False
+
+    def release(self):
+        if self.lease_path and os.path.exists(self.lease_path):
+            os.remove(self.lease_path)
+        self.lease_path = None
+
+    def close(self):
+        self.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def transform(self, texts):
+        """TF-IDF rows equivalent to vectorizer.transform, in exported column order."""
+        terms = self.arrays['terms']
+        long_terms = self.arrays['long_terms']
+        rows, tokens = [], []
+        for i, text in enumerate(texts):
+            doc_tokens = [token.encode('utf-8') for token in self.analyzer(text)]
+            tokens.extend(doc_tokens)
+            rows.extend([i] * len(doc_tokens))
+
+        lengths = np.fromiter(map(len, tokens), dtype=np.int64, count=len(tokens))
+        rows = np.array(rows, dtype=np.int64)
+        is_short = lengths <= terms.dtype.itemsize
+        # Tokens longer than the widest term cannot be in the vocabulary (and would be truncated)
+        is_long = ~is_short & (lengths <= long_terms.dtype.itemsize)
+        tokens = np.array(tokens, dtype=object)
+        short_rows, short_cols = _lookup(terms, tokens[is_short], rows[is_short])
+        long_rows, long_cols = _lookup(long_terms, tokens[is_long], rows[is_long])
+        rows = np.concatenate([short_rows, long_rows])
+        cols = np.concatenate([short_cols, long_cols + len(terms)])
+        n_terms = len(terms) + len(long_terms)
+
+        X = csr_matrix((np.ones(len(cols)), (rows, cols)), shape=(len(texts), n_terms))
+        X.sum_duplicates()
+        if self.meta['binary']:
+            X.data[:] = 1.0
+        elif self.meta['sublinear_tf']:
+            X.data = np.log(X.data) + 1.0
+        X.data *= self.arrays['idf'][X.indices]
+        if self.meta['norm']:
+            X = normalize(X, norm=self.meta['norm'], copy=False)
+        return X
+
+    def decision_function(self, X):
+        scores = X @ self.arrays['weights'].T + self.arrays['bias']
+        return scores.ravel() if scores.shape[1] == 1 else scores
+
+    def _scores(self, texts):
+        if time.monotonic() - self.last_check > self.check_interval:
+            self.refresh()
+        return self.decision_function(self.transform(texts))
+
+    def _probabilities(self, scores):
+        if self.meta['kind'] == 'multinomial':
+            exp = np.exp(scores - scores.max(axis=1, keepdims=True))
+            return exp / exp.sum(axis=1, keepdims=True)
+
+        calibration = self.meta['calibration']
+        if calibration['method'] == 'isotonic':
+            positive = np.interp(scores, self.arrays['table_x'], self.arrays['table_y'])
+        elif calibration['method'] == 'sigmoid':
+            positive = _sigmoid(calibration['slope'] * scores + calibration['intercept'])
+        else:
+            positive = _sigmoid(scores)
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict_proba(self, texts):
+        return self._probabilities(self._scores(texts))
+
+    def predict(self, texts):
+        """Returns (labels, confidences in percent) for a list of texts."""
+        scores = self._scores(texts)
+        probabilities = self._probabilities(scores)
+        if scores.ndim == 1:
+            # Same decision rule as the wrapped model's predict, even when calibrated
+            columns = (scores > 0).astype(int)
+        else:
+            columns = scores.argmax(axis=1)
+        # Confidence is the probability of the predicted label, as in predicted_label_confidences
+        return self.classes_[columns], probabilities[np.arange(len(columns)), columns] * 100
+
+    def predict_gender(self, text):
+        labels, confidences = self.predict([text])
+        return labels[0], float(confidences[0])
+
+
+def _rss_kb():
+    """Resident set size of this process (Linux only)."""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _worker(args):
+    root, texts = args
+    with SharedModelClient(root) as client:
+        labels, confidences = client.predict(texts)
+        return os.getpid(), client.version, list(labels), _rss_kb()
+
+
+if __name__ == "__main__":
+    import joblib
+    from multiprocessing import Pool
+    from utils import predict_with_confidence
+
+    model = joblib.load('gender_model.joblib')
+    vectorizer = joblib.load('vectorizer.joblib')
+
+    print("Publishing model to shared storage...")
+    version = publish(model, vectorizer)
+    print(f"Published version {version}; removed old versions: {cleanup()}")
+
+    example_texts = [
+        "I love coding and playing video games.",
+        "Shopping for new shoes and dresses today!",
+        "Working on my car in the garage.",
+        "Baking cookies for the family.",
+        "Just finished a great workout at the gym."
+    ]
+    expected, _ = predict_with_confidence(model, vectorizer, example_texts)
+
+    with Pool(4) as pool:
+        for pid, worker_version, labels, rss in pool.map(_worker, [(SHARED_DIR, example_texts)] * 4):
+            status = "OK" if labels == list(expected) else "MISMATCH"
+            print(f"Worker {pid}: version {worker_version}, RSS {rss} kB, predictions {status}")
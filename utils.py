@@ -0,0 +1,98 @@
+import os
+import re
+import pandas as pd
+
+from calibration import predicted_label_confidences
+
+# Local copies of the two source corpora shipped with the project
+DATASET_PATHS = {
+    'twitter': 'twitter_reduced.csv',
+    'blog': 'blogtext_reduced.csv'
+}
+
+
+def preprocess_text(text):
+    """Collapse whitespace the same way the GUI does before prediction."""
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def sentiment_label(polarity):
+    """Maps a TextBlob polarity to the label shown to users."""
+    if polarity > 0.3:
+        return "Very Positive"
+    elif polarity > 0:
+        return "Positive"
+    elif polarity < -0.3:
+        return "Very Negative"
+    elif polarity < 0:
+        return "Negative"
+    else:
+        return "Neutral"
+
+
+def analyze_mood(text, polarity, subjectivity):
+    """Analyze the mood based on text content and sentiment metrics."""
+    # Count various indicators
+    exclamation_count = text.count('!')
+    question_count = text.count('?')
+    caps_ratio = sum(1 for c in text if c.isupper()) / len(text) if text else 0
+
+    # Enhanced mood analysis
+    if polarity > 0.7 and exclamation_count > 1:
+        return "Very Excited/Enthusiastic"
+    elif polarity > 0.5 and exclamation_count > 0:
+        return "Excited/Enthusiastic"
+    elif polarity > 0.3:
+        return "Happy/Positive"
+    elif polarity < -0.7:
+        return "Very Angry/Frustrated"
+    elif polarity < -0.5:
+        return "Angry/Frustrated"
+    elif polarity < -0.3:
+        return "Sad/Negative"
+    elif question_count > 2:
+        return "Very Curious/Questioning"
+    elif question_count > 0:
+        return "Curious/Questioning"
+    elif caps_ratio > 0.5:
+        return "Very Emphatic/Intense"
+    elif caps_ratio > 0.3:
+        return "Emphatic/Intense"
+    elif subjectivity > 0.9:
+        return "Very Emotional"
+    elif subjectivity > 0.8:
+        return "Emotional"
+    elif subjectivity < 0.1:
+        return "Very Objective/Factual"
+    elif subjectivity < 0.2:
+        return "Objective/Factual"
+    else:
+        return "Neutral"
+
+
+def load_datasets(paths=None):
+    """Loads the source corpora into one frame with a 'source' column."""
+    paths = paths or DATASET_PATHS
+    frames = []
+    for source, path in paths.items():
+        df = pd.read_csv(path, encoding='utf-8')
+        df.dropna(subset=['text', 'gender'], inplace=True)
+        df = df[df['gender'].isin(['male', 'female'])].copy()
+        df['source'] = source
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+
+def predict_with_confidence(model, vectorizer, texts):
+    """Returns (labels, confidences in percent) for a list of texts."""
+    X = vectorizer.transform(texts)
+    labels, confidences = predicted_label_confidences(model, X)
+    return labels, confidences
+
+
+def write_atomic(path, content):
+    """Writes a small text file so readers only ever see the old or the new content."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)